@@ -1,194 +1,585 @@
+import asyncio
+import functools
+import hashlib
 import logging
 import json
 import os
+import threading
+import time
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from textwrap import dedent
+from typing import Final, Optional
 
+from groq import BadRequestError, Groq as GroqClient
 from phi.llm.groq import Groq
 from phi.assistant import Assistant
 
 from duckduckgo_search import DDGS
 from phi.tools.newspaper4k import Newspaper4k
+import newspaper.network
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import boto3
+from botocore.exceptions import BotoCoreError, ClientError
 
 logger = logging.getLogger()
-logger.setLevel(logging.DEBUG)
+# A bad LOG_LEVEL must not crash container init, so unknown names fall back to INFO
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").strip().upper()
+logger.setLevel(LOG_LEVEL if LOG_LEVEL in logging.getLevelNamesMapping() else logging.INFO)
 dynamodb = boto3.resource("dynamodb")
 
+GROQ_MODEL = "llama3-70b-8192"
+METRICS_NAMESPACE = "NewsletterAgent"
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+NEWS_CACHE_TTL_SECONDS = 15 * 60
+FETCH_CACHE_TTL_SECONDS = 24 * 60 * 60
+ARTICLE_CACHE_TTL_SECONDS = 24 * 60 * 60
+# phi only forwards a truthy temperature, so 0 has to go through request_params. Greedy
+# decoding keeps responses reproducible, which is what makes the exact-match cache sound.
+GROQ_REQUEST_PARAMS = {"temperature": 0}
+# Articles are summarized in batches; the per-article and per-batch word budgets keep
+# the prompt plus the generated reports inside the 8192-token context window
+ARTICLE_TEXT_WORDS = 3000
+SUMMARY_BATCH_WORDS = 3000
+# How often the partially written article is saved while the writer streams
+STREAM_FLUSH_SECONDS = 1.0
+# Worker threads for blocking calls; matches the HTTP connection pool so every concurrent
+# fetch can hold its own connection
+POOL_SIZE = 16
+
+# Prompt formats are dedented once at import; the assistants only ever reference them
+SUMMARY_FORMAT: Final[str] = dedent(
+    """
+    <report_format>
+    **Overview:**\n
+    {overview of the article}
+
+    **Details:**\n
+    {details/facts/main points from the article}
+
+    **Key Takeaways:**\n
+    {provide key takeaways from the article}
+    </report_format>
+    """
+)
+
+ARTICLE_FORMAT: Final[str] = dedent(
+    """
+    <article_format>
+    ## Engaging Article Title
+
+    ### Overview
+    {give a brief introduction of the article and why the user should read this report}
+    {make this section engaging and create a hook for the reader}
+
+    ### Section 1
+    {break the article into sections}
+    {provide details/facts/processes in this section}
+
+    ... more sections as necessary...
+
+    ### Takeaways
+    {provide key takeaways from the article}
+
+    ### References
+    - [Title](url)
+    - [Title](url)
+    - [Title](url)
+    </article_format>
+    """
+)
+
+# Built once per container and reused by every warm invocation. Nothing here may fail on
+# configuration: errors raised before the handler's try block never reach 'FAILED'.
+# Only PROCESS_TABLE is required, since without it no status can be recorded at all.
+PROCESS_TABLE = dynamodb.Table(os.environ["PROCESS_TABLE"])
+# All blocking work (boto3, DDGS, newspaper4k, phi) runs on this pool. The default one has
+# min(32, cpu_count + 4) workers, only 5-6 on this Lambda, which serialises the fan-out.
+# asyncio.run would also build a new loop and shut its executor down on every invocation,
+# so the handler runs on one long-lived loop instead.
+EXECUTOR = ThreadPoolExecutor(max_workers=POOL_SIZE)
+LOOP = asyncio.new_event_loop()
+LOOP.set_default_executor(EXECUTOR)
+# The cache is optional; without CACHE_TABLE every lookup is a miss
+CACHE_TABLE = dynamodb.Table(os.environ["CACHE_TABLE"]) if "CACHE_TABLE" in os.environ else None
+DDGS_CLIENT = DDGS()
+NEWSPAPER_TOOLS = Newspaper4k()
+# newspaper4k fetches every article through one module-level requests.Session; size its
+# pool for the concurrent fetches and retry failed connects so connections are reused.
+# Read timeouts are not retried: each retry would wait out newspaper4k's full timeout again.
+NEWSPAPER_ADAPTER = HTTPAdapter(
+    pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=Retry(total=2, read=0, backoff_factor=0.2)
+)
+newspaper.network.session.mount("https://", NEWSPAPER_ADAPTER)
+newspaper.network.session.mount("http://", NEWSPAPER_ADAPTER)
+REPORT_INSTRUCTIONS = [
+    "Your report should be less than 500 words.",
+    "Provide as many details and facts as possible in the summary.",
+    "Your report will be used to generate a final New York Times worthy report.",
+    "REMEMBER: you are writing for the New York Times, so the quality of the report is important.",
+    "Make sure your report is properly formatted and follows the <report_format> provided below.",
+]
+
+# System prompts must stay byte-identical across calls so the provider can reuse the
+# cached prefix; per-call values such as the date belong in the user message instead.
+ARTICLE_SUMMARIZER = Assistant(
+    name="Article Summarizer",
+    llm=Groq(
+        model=GROQ_MODEL,
+        response_format={"type": "json_object"},
+        request_params=GROQ_REQUEST_PARAMS,
+    ),
+    description="You are a Senior NYT Editor and your task is to summarize newspaper articles.",
+    instructions=[
+        'You will be provided with a JSON array of newspaper articles, each with an "idx" and "text".',
+        "Carefully read each article a prepare a thorough report of key facts and details.",
+        *REPORT_INSTRUCTIONS,
+        'Respond with a JSON object {"reports": [...]} holding one report string per article, in the same order.',
+    ],
+    add_to_system_prompt=SUMMARY_FORMAT,
+    # This setting tells the LLM to format messages in markdown
+    markdown=True,
+)
+
+# Summarizes one article as plain markdown: single-article batches need no JSON wrapper,
+# and articles from a batch that JSON mode failed on are retried here
+PLAIN_SUMMARIZER = Assistant(
+    name="Plain Article Summarizer",
+    llm=Groq(model=GROQ_MODEL, request_params=GROQ_REQUEST_PARAMS),
+    description="You are a Senior NYT Editor and your task is to summarize a newspaper article.",
+    instructions=[
+        "You will be provided with the text from a newspaper article.",
+        "Carefully read the article a prepare a thorough report of key facts and details.",
+        *REPORT_INSTRUCTIONS,
+    ],
+    add_to_system_prompt=SUMMARY_FORMAT,
+    # This setting tells the LLM to format messages in markdown
+    markdown=True,
+)
+
+ARTICLE_WRITER = Assistant(
+    name="Article Writer",
+    llm=Groq(model=GROQ_MODEL, request_params=GROQ_REQUEST_PARAMS),
+    description="You are a Senior NYT Editor and your task is to write a NYT cover story worthy article due tomorrow.",
+    instructions=[
+        "You will be provided with a topic and pre-processed summaries from junior researchers.",
+        "Carefully read the provided information and think about the contents",
+        "Then generate a final New York Times worthy article in the <article_format> provided below.",
+        "Make your article engaging, informative, and well-structured.",
+        "Break the article into sections and provide key takeaways at the end.",
+        "Make sure the title is catchy and engaging.",
+        "Give the section relevant titles and provide details/facts/processes in each section."
+        "REMEMBER: you are writing for the New York Times, so the quality of the article is important.",
+    ],
+    add_to_system_prompt=ARTICLE_FORMAT,
+    # This setting tells the LLM to format messages in markdown
+    markdown=True,
+)
+
+
+ASSISTANTS = (ARTICLE_SUMMARIZER, PLAIN_SUMMARIZER, ARTICLE_WRITER)
+
+
+@functools.cache
+def get_groq_client() -> GroqClient:
+    # Built on first use rather than at import, so a missing GROQ_API_KEY is recorded as
+    # a FAILED process. phi's Groq LLM builds a new client (and connection pool) per
+    # request unless one is passed in, so every assistant shares this one.
+    client = GroqClient()
+    for assistant in ASSISTANTS:
+        assistant.llm.groq_client = client
+    return client
+
+
+def reset_assistants():
+    # The assistants outlive the invocation, so drop the previous run's messages and metrics
+    for assistant in ASSISTANTS:
+        assistant.memory.clear()
+        assistant.llm.metrics = {}
+
+
+def cache_key(*parts: str) -> str:
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def prompt_fingerprint(*assistants: Assistant) -> str:
+    # Folds the model, system prompts and decoding settings into the cache keys, so a
+    # prompt or parameter change stops serving responses generated under the old one
+    return cache_key(
+        *(
+            part
+            for assistant in assistants
+            for part in (
+                assistant.llm.model,
+                assistant.get_system_prompt() or "",
+                json.dumps(assistant.llm.request_params, sort_keys=True),
+                json.dumps(assistant.llm.response_format, sort_keys=True),
+            )
+        )
+    )
+
+
+# Either summarizer may produce a cached summary, so both prompts are part of its key
+SUMMARY_FINGERPRINT = prompt_fingerprint(ARTICLE_SUMMARIZER, PLAIN_SUMMARIZER)
+ARTICLE_FINGERPRINT = prompt_fingerprint(ARTICLE_WRITER)
+
+
+# The cache is an optimization: a failed read is a miss and a failed write is skipped
+def get_cached(key: str):
+    if CACHE_TABLE is None:
+        return None
+    try:
+        item = CACHE_TABLE.get_item(Key={"cacheKey": key}).get("Item")
+    except (BotoCoreError, ClientError) as e:
+        logger.warning("Could not read cache entry: %s", e)
+        return None
+    # DynamoDB deletes expired items lazily, so check the TTL ourselves
+    if item and int(item["ttl"]) > time.time():
+        return item["value"]
+    return None
+
+
+def put_cached(key: str, value: str, ttl_seconds: int = CACHE_TTL_SECONDS):
+    if CACHE_TABLE is None:
+        return
+    try:
+        CACHE_TABLE.put_item(
+            Item={"cacheKey": key, "value": value, "ttl": int(time.time()) + ttl_seconds}
+        )
+    except (BotoCoreError, ClientError) as e:
+        logger.warning("Could not write cache entry: %s", e)
+
+
+def emit_metric(name: str, value: float = 1, unit: str = "Count"):
+    # CloudWatch Embedded Metric Format: Lambda ships stdout to CloudWatch Logs, which turns
+    # this line into a metric without a PutMetricData call or extra IAM permissions
+    print(
+        json.dumps(
+            {
+                "_aws": {
+                    "Timestamp": int(time.time() * 1000),
+                    "CloudWatchMetrics": [
+                        {"Namespace": METRICS_NAMESPACE, "Dimensions": [[]], "Metrics": [{"Name": name, "Unit": unit}]}
+                    ],
+                },
+                name: value,
+            }
+        )
+    )
+
+
+def update_process(process_id: str, remove: tuple = (), **attributes):
+    update_expression = "SET " + ", ".join(f"#{name} = :{name}" for name in attributes)
+    if remove:
+        update_expression += " REMOVE " + ", ".join(f"#{name}" for name in remove)
+    PROCESS_TABLE.update_item(
+        Key={"processId": process_id},
+        UpdateExpression=update_expression,
+        ExpressionAttributeNames={f"#{name}": name for name in (*attributes, *remove)},
+        ExpressionAttributeValues={f":{name}": value for name, value in attributes.items()},
+    )
+
+
+def search_news(question: str) -> list:
+    # Searches are bucketed into NEWS_CACHE_TTL_SECONDS windows, so a repeated topic is
+    # sent to DuckDuckGo at most once per window
+    bucket = int(time.time() // NEWS_CACHE_TTL_SECONDS)
+    key = cache_key("ddgs", question.lower().strip(), str(bucket))
+    cached = get_cached(key)
+    if cached is not None:
+        logger.info("Using cached news search for %s", question)
+        return json.loads(cached)
+    results = DDGS_CLIENT.news(keywords=question, max_results=5)
+    if results:
+        put_cached(key, json.dumps(results), NEWS_CACHE_TTL_SECONDS)
+    return results
+
+
+def truncate_text(text: str, words: int) -> str:
+    # Keep whole paragraphs while they fit and only cut the one that crosses the budget
+    kept = []
+    for paragraph in text.split("\n\n"):
+        if words <= 0:
+            break
+        paragraph_words = paragraph.split()
+        if len(paragraph_words) > words:
+            kept.append(" ".join(paragraph_words[:words]))
+            break
+        kept.append(paragraph)
+        words -= len(paragraph_words)
+    return "\n\n".join(kept)
+
+
+def fetch_article_text(url: str, title: str) -> Optional[str]:
+    # Caches the truncated text per URL, so a repeated topic skips the download and parse
+    # and its summaries (keyed on this text) hit the cache as well
+    key = cache_key("article", url)
+    cached = get_cached(key)
+    if cached is not None:
+        return cached
+    article_data = NEWSPAPER_TOOLS.get_article_data(url)
+    if not article_data or "text" not in article_data:
+        return None
+    text = truncate_text(article_data["text"], ARTICLE_TEXT_WORDS)
+    if text != article_data["text"]:
+        logger.info(
+            "Truncated article text for %s from %d to %d words",
+            title,
+            len(article_data["text"].split()),
+            len(text.split()),
+        )
+    put_cached(key, text, FETCH_CACHE_TTL_SECONDS)
+    return text
+
+
+def batch_by_budget(sizes: list, budget: int) -> list:
+    batches, batch, total = [], [], 0
+    for i, size in enumerate(sizes):
+        if batch and total + size > budget:
+            batches.append(batch)
+            batch, total = [], 0
+        batch.append(i)
+        total += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def report_to_text(report):
+    # JSON mode tempts the model to return the <report_format> sections as an object
+    if isinstance(report, str):
+        return report
+    if not isinstance(report, dict):
+        return None
+    sections = []
+    for title, body in report.items():
+        if isinstance(body, list):
+            body = "\n".join(f"- {item}" for item in body)
+        sections.append(f"**{title.replace('_', ' ').title()}:**\n\n{body}")
+    return "\n\n".join(sections)
+
+
+def parse_reports(response: str, count: int):
+    try:
+        reports = json.loads(response)["reports"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(reports, list) or len(reports) != count:
+        return None
+    reports = [report_to_text(report) for report in reports]
+    return None if None in reports else reports
+
+
+def summarize_article(text: str) -> str:
+    return PLAIN_SUMMARIZER.run(text, stream=False)
+
+
+def summarize_articles(texts: list) -> Optional[list]:
+    # Returns None when the batch fails, so the caller can retry its articles concurrently.
+    # Only parsed reports or plain markdown summaries are returned, never a raw reply.
+    if len(texts) == 1:
+        return [summarize_article(texts[0])]
+    payload = json.dumps([{"idx": i, "text": text} for i, text in enumerate(texts)])
+    try:
+        reports = parse_reports(ARTICLE_SUMMARIZER.run(payload, stream=False), len(texts))
+    except BadRequestError as e:
+        # e.g. json_validate_failed when the reports run past the context window
+        logger.warning("Groq rejected the summary request for %d articles: %s", len(texts), e)
+        return None
+    if reports is None:
+        logger.warning("Could not parse %d batched summaries, summarizing one at a time", len(texts))
+    return reports
+
+
+def warm_up_groq():
+    # Opens the TLS connection to Groq in the shared client's pool ahead of the first summary
+    try:
+        get_groq_client().with_options(timeout=2, max_retries=0).models.list()
+    except Exception as e:
+        logger.debug("Groq warm-up failed: %s", e)
+
+
+def write_article(process_id: str, article_draft: str) -> str:
+    # Streams the article into the 'partialResult' of the still PROCESSING item, so pollers
+    # can show the article as it is written. 'result' is only ever the finished article.
+    chunks = []
+    last_flush = time.monotonic()
+    for chunk in ARTICLE_WRITER.run(article_draft, stream=True):
+        chunks.append(chunk)
+        if time.monotonic() - last_flush >= STREAM_FLUSH_SECONDS:
+            update_process(process_id, partialResult=json.dumps("".join(chunks)))
+            last_flush = time.monotonic()
+    return "".join(chunks)
+
+
+def completed_response(process_id: str, res: str) -> dict:
+    return {
+        "statusCode": 200,
+        "body": json.dumps(
+            {
+                "processId": process_id,
+                "message": "Process completed successfully",
+                "result": res,
+            }
+        ),
+        "headers": {"Content-Type": "application/json"},
+    }
+
 
 def handler(event, context):
+    return LOOP.run_until_complete(_run(event))
+
+
+async def _run(event):
     process_id = event["processId"]
     question = event["question"]
-    # Update the process status to 'PROCESSING' in DynamoDB
-    process_table = dynamodb.Table(os.environ["PROCESS_TABLE"])
-    process_table.update_item(
-        Key={"processId": process_id},
-        UpdateExpression="SET #status = :status",
-        ExpressionAttributeNames={"#status": "status"},
-        ExpressionAttributeValues={":status": "PROCESSING"},
+    loop = asyncio.get_running_loop()
+    # boto3 is synchronous, so every DynamoDB call runs on the executor to keep the event
+    # loop free. Update the process status to 'PROCESSING' in the background so the
+    # round-trip overlaps with the news search instead of delaying it
+    processing_update = loop.run_in_executor(
+        None, functools.partial(update_process, process_id, status="PROCESSING")
     )
+    # Cache writes are not needed by this invocation and only get awaited before returning
+    cache_writes = []
 
     try:
+        reset_assistants()
+        get_groq_client()
 
-        def truncate_text(text: str, words: int) -> str:
-            return " ".join(text.split()[:words])
-        
-        news_summary_length = 5000 
+        news_summary_length = 5000
 
         news_results = []
 
-        ddgs = DDGS()
-        newspaper_tools = Newspaper4k()
-        results = ddgs.news(keywords=question, max_results=5)
-        for r in results:
-            if "url" in r:
-                article_data = newspaper_tools.get_article_data(r["url"])
-                if article_data and "text" in article_data:
-                    r["text"] = article_data["text"]
-                    news_results.append(r)
-                    
-        logger.info(f"Found {len(news_results)} news articles for {question}")
+        # Warm up the Groq connection while the news search is in flight. It runs on its own
+        # daemon thread so nothing joins it and it never takes an executor worker.
+        threading.Thread(target=warm_up_groq, daemon=True).start()
+        results = await loop.run_in_executor(None, search_news, question)
 
-        logger.info(f"News results: {news_results}")                  
+        async def fetch(r):
+            return await loop.run_in_executor(None, fetch_article_text, r["url"], r["title"])
 
-        # Summarizer
-        news_summary = ""
-        if len(news_results) > 0:
-            article_summarizer = Assistant(
-                name="Article Summarizer",
-                llm=Groq(model="llama3-70b-8192"),
-                description="You are a Senior NYT Editor and your task is to summarize a newspaper article.",
-                instructions=[
-                    "You will be provided with the text from a newspaper article.",
-                    "Carefully read the article a prepare a thorough report of key facts and details.",
-                    "Your report should be less than 500 words.",
-                    "Provide as many details and facts as possible in the summary.",
-                    "Your report will be used to generate a final New York Times worthy report.",
-                    "REMEMBER: you are writing for the New York Times, so the quality of the report is important.",
-                    "Make sure your report is properly formatted and follows the <report_format> provided below.",
-                ],
-                add_to_system_prompt=dedent(
-                    """
-            <report_format>
-            **Overview:**\n
-            {overview of the article}
-
-            **Details:**\n
-            {details/facts/main points from the article}
-
-            **Key Takeaways:**\n
-            {provide key takeaways from the article}
-            </report_format>
-            """
-                ),
-                # This setting tells the LLM to format messages in markdown
-                markdown=True,
-                add_datetime_to_instructions=True,
+        results = [r for r in results if "url" in r]
+        fetch_tasks = [asyncio.create_task(fetch(r)) for r in results]
+        articles = await asyncio.gather(*fetch_tasks)
+        for r, text in zip(results, articles):
+            if text:
+                r["text"] = text
+                news_results.append(r)
+
+        logger.info("Found %d news articles for %s", len(news_results), question)
+
+        # Without articles the writer has nothing to work from, so skip both LLM steps
+        if not news_results:
+            emit_metric("ZeroResultQuery")
+            res = f"# Topic: {question}\n\nNo recent news articles were found on this topic."
+            await processing_update
+            await loop.run_in_executor(
+                None, functools.partial(update_process, process_id, status="COMPLETED", result=json.dumps(res))
+            )
+            return completed_response(process_id, res)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            # Article bodies can run to tens of KB each, so only their length is logged
+            logger.debug(
+                "News results: %s",
+                [{"url": r["url"], "title": r["title"], "text_len": len(r["text"])} for r in news_results],
             )
-            
-            for news_result in news_results:
-                news_summary += f"### {news_result['title']}\n\n"
-                news_summary += f"- Date: {news_result['date']}\n\n"
-                news_summary += f"- URL: {news_result['url']}\n\n"
-                news_summary += f"#### Introduction\n\n{news_result['body']}\n\n"
-
-                summary = article_summarizer.run(news_result["text"], stream=False)
-                summary_length = len(summary.split())
-                if summary_length > news_summary_length:
-                    summary = truncate_text(summary, news_summary_length)
-                    logger.info(f"Truncated summary for {news_result['title']} to {news_summary_length} words.")
-                    
-                news_summary += "#### Summary\n\n"
-                news_summary += summary
-                news_summary += "\n\n---\n\n"
-                if len(news_summary.split()) > news_summary_length:
-                    logger.info(f"Stopping news summary at length: {len(news_summary.split())}")
-                    break
-
-        article_draft = ""
-        article_draft += f"# Topic: {question}\n\n"
-        if news_summary:
-            article_draft += "## Summary of News Articles\n\n"
-            article_draft += f"This section provides a summary of the news articles about {question}.\n\n"
-            article_draft += "<news_summary>\n\n"
-            article_draft += f"{news_summary}\n\n"
-            article_draft += "</news_summary>\n\n"            
-
-        article_writer = Assistant(
-            name="Article Writer",
-            llm=Groq(model="llama3-70b-8192"),
-            description="You are a Senior NYT Editor and your task is to write a NYT cover story worthy article due tomorrow.",
-            instructions=[
-                "You will be provided with a topic and pre-processed summaries from junior researchers.",
-                "Carefully read the provided information and think about the contents",
-                "Then generate a final New York Times worthy article in the <article_format> provided below.",
-                "Make your article engaging, informative, and well-structured.",
-                "Break the article into sections and provide key takeaways at the end.",
-                "Make sure the title is catchy and engaging.",
-                "Give the section relevant titles and provide details/facts/processes in each section."
-                "REMEMBER: you are writing for the New York Times, so the quality of the article is important.",
-            ],
-            add_to_system_prompt=dedent(
-                """
-        <article_format>
-        ## Engaging Article Title
-
-        ### Overview
-        {give a brief introduction of the article and why the user should read this report}
-        {make this section engaging and create a hook for the reader}
-
-        ### Section 1
-        {break the article into sections}
-        {provide details/facts/processes in this section}
-
-        ... more sections as necessary...
-
-        ### Takeaways
-        {provide key takeaways from the article}
-
-        ### References
-        - [Title](url)
-        - [Title](url)
-        - [Title](url)
-        </article_format>
-        """
-            ),
-            # This setting tells the LLM to format messages in markdown
-            markdown=True,
-            add_datetime_to_instructions=True,
-        )
 
-        res = article_writer.run(article_draft, stream=False)
+        # Summarizer
+        news_summary_parts = []
+        running_words = 0
+        texts = [r["text"] for r in news_results]
+        keys = [cache_key(SUMMARY_FINGERPRINT, text) for text in texts]
+        summaries = await asyncio.gather(*[loop.run_in_executor(None, get_cached, key) for key in keys])
 
-        process_table.update_item(
-            Key={"processId": process_id},
-            UpdateExpression="SET #status = :status, #result = :result",
-            ExpressionAttributeNames={"#status": "status", "#result": "result"},
-            ExpressionAttributeValues={
-                ":status": "COMPLETED",
-                ":result": json.dumps(res),
-            },
+        # Summarize every cache miss in as few LLM calls as fit the context window
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        batches = [
+            [missing[j] for j in batch]
+            for batch in batch_by_budget([len(texts[i].split()) for i in missing], SUMMARY_BATCH_WORDS)
+        ]
+        batch_summaries = await asyncio.gather(
+            *[loop.run_in_executor(None, summarize_articles, [texts[i] for i in batch]) for batch in batches]
         )
+        failed = [i for batch, reports in zip(batches, batch_summaries) if reports is None for i in batch]
+        summarized = [
+            (i, summary)
+            for batch, reports in zip(batches, batch_summaries)
+            if reports is not None
+            for i, summary in zip(batch, reports)
+        ]
+        # Articles from failed batches are retried one per call, all at once
+        retried = await asyncio.gather(*[loop.run_in_executor(None, summarize_article, texts[i]) for i in failed])
+        for i, summary in [*summarized, *zip(failed, retried)]:
+            summaries[i] = summary
+            cache_writes.append(loop.run_in_executor(None, put_cached, keys[i], summary))
 
-        return {
-            "statusCode": 200,
-            "body": json.dumps(
-                {
-                    "processId": process_id,
-                    "message": "Process completed successfully",
-                    "result": res,
-                }
+        for news_result, summary in zip(news_results, summaries):
+            news_summary_parts.append(f"### {news_result['title']}\n\n")
+            news_summary_parts.append(f"- Date: {news_result['date']}\n\n")
+            news_summary_parts.append(f"- URL: {news_result['url']}\n\n")
+            news_summary_parts.append(f"#### Introduction\n\n{news_result['body']}\n\n")
+
+            # Counting spaces is a cheap word-count proxy that allocates nothing
+            summary_length = summary.count(" ") + 1
+            if summary_length > news_summary_length:
+                summary = truncate_text(summary, news_summary_length)
+                logger.info("Truncated summary for %s to %d words.", news_result["title"], news_summary_length)
+
+            news_summary_parts.append("#### Summary\n\n")
+            news_summary_parts.append(summary)
+            news_summary_parts.append("\n\n---\n\n")
+            running_words += min(summary_length, news_summary_length) + news_result["body"].count(" ") + 1
+            if running_words > news_summary_length:
+                logger.info("Stopping news summary at length: %d", running_words)
+                break
+        news_summary = "".join(news_summary_parts)
+
+        article_draft_parts = [
+            f"# Topic: {question}\n\n",
+            f"Today's date: {datetime.now():%Y-%m-%d}\n\n",
+        ]
+        article_draft_parts.append("## Summary of News Articles\n\n")
+        article_draft_parts.append(f"This section provides a summary of the news articles about {question}.\n\n")
+        article_draft_parts.append("<news_summary>\n\n")
+        article_draft_parts.append(f"{news_summary}\n\n")
+        article_draft_parts.append("</news_summary>\n\n")
+        article_draft = "".join(article_draft_parts)
+
+        # Every write below must land after 'PROCESSING', never before it
+        await processing_update
+
+        article_key = cache_key(ARTICLE_FINGERPRINT, article_draft)
+        res = await loop.run_in_executor(None, get_cached, article_key)
+        if res is None:
+            res = await loop.run_in_executor(None, write_article, process_id, article_draft)
+            cache_writes.append(
+                loop.run_in_executor(None, put_cached, article_key, res, ARTICLE_CACHE_TTL_SECONDS)
+            )
+        else:
+            logger.info("Using cached article for %s", question)
+
+        # Lambda freezes the environment once the handler returns, so the terminal write
+        # is awaited rather than left running in the background
+        await loop.run_in_executor(
+            None,
+            functools.partial(
+                update_process, process_id, remove=("partialResult",), status="COMPLETED", result=json.dumps(res)
             ),
-            "headers": {"Content-Type": "application/json"},
-        }
+        )
+        await asyncio.gather(*cache_writes)
+
+        return completed_response(process_id, res)
     except Exception as e:
         # Update the process status to 'FAILED' in DynamoDB if an error occurs
-        process_table.update_item(
-            Key={"processId": process_id},
-            UpdateExpression="SET #status = :status, #error = :error",
-            ExpressionAttributeNames={"#status": "status", "#error": "error"},
-            ExpressionAttributeValues={":status": "FAILED", ":error": str(e)},
+        await asyncio.wait([processing_update, *cache_writes])
+        await loop.run_in_executor(
+            None,
+            functools.partial(update_process, process_id, remove=("partialResult",), status="FAILED", error=str(e)),
         )
         return {
             "statusCode": 500,
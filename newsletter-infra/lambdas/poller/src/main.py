@@ -23,6 +23,8 @@ def handler(event, context):
     process_item = response['Item']
     process_status = process_item.get('status', 'PENDING')
     process_result = process_item.get('result', None)
+    # Set while the article is still being streamed; removed once the process finishes
+    process_partial_result = process_item.get('partialResult', None)
     
     # Return the process status and result
     return {
@@ -30,6 +32,7 @@ def handler(event, context):
         'body': json.dumps({
             'processId': process_id,
             'status': process_status,
-            'result': process_result
+            'result': process_result,
+            'partialResult': process_partial_result
         })
     }
\ No newline at end of file
@@ -29,6 +29,12 @@ export class NewsletterInfraStack extends cdk.Stack {
         billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
     });
 
+    const llmCacheTable = new dynamodb.Table(this, "newsletterAgentLlmCache", {
+        partitionKey: { name: "cacheKey", type: dynamodb.AttributeType.STRING },
+        billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+        timeToLiveAttribute: "ttl",
+    });
+
     const httpApi = new apigatewayv2.HttpApi(this, "newsletterAgentHttpApi", {
         corsPreflight: {
             allowHeaders: ['Content-Type'],
@@ -45,6 +51,7 @@ export class NewsletterInfraStack extends cdk.Stack {
         environment: {
             GROQ_API_KEY: process.env.GROQ_API_KEY as string,
             PROCESS_TABLE: processStatusTable.tableName,
+            CACHE_TABLE: llmCacheTable.tableName,
         },
     });
     
@@ -88,6 +95,7 @@ export class NewsletterInfraStack extends cdk.Stack {
     processStatusTable.grantReadWriteData(initiatorLambda);
     processStatusTable.grantReadWriteData(newsletterAgentLambda);
     processStatusTable.grantReadData(statusCheckLambda);
+    llmCacheTable.grantReadWriteData(newsletterAgentLambda);
     
     newsletterAgentLambda.grantInvoke(initiatorLambda);
 